@@ -1,12 +1,12 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 from werkzeug.middleware.proxy_fix import ProxyFix
-from tensorflow.keras.models import load_model
 from utils import preprocess_image, predict_result
 import os
 import werkzeug
 import json
 from datetime import datetime
 from functools import wraps
+import threading
 
 app = Flask(__name__)
 app.secret_key = 'super_secret_medical_key' # Change for production
@@ -27,8 +27,10 @@ USERS_FILE = 'data/users.json'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
-# Global variable for model
+# Global variable for model (loaded lazily on the first /predict request so that
+# login, register, dashboard and reports never pay the TensorFlow import cost)
 model = None
+model_lock = threading.Lock()
 
 # Ensure data directory exists
 os.makedirs('data', exist_ok=True)
@@ -60,15 +62,20 @@ def save_users(users):
 
 def load_inference_model():
     global model
-    if os.path.exists(MODEL_PATH):
-        print(f"Loading model from {MODEL_PATH}...")
-        try:
-            model = load_model(MODEL_PATH)
-            print("Model loaded successfully.")
-        except Exception as e:
-            print(f"Error loading model: {e}")
-    else:
-        print(f"Warning: Model file not found at {MODEL_PATH}. Prediction will fail.")
+    with model_lock:
+        # Another request may have loaded the model while we waited on the lock
+        if model is not None:
+            return
+        if os.path.exists(MODEL_PATH):
+            print(f"Loading model from {MODEL_PATH}...")
+            try:
+                from tensorflow.keras.models import load_model
+                model = load_model(MODEL_PATH)
+                print("Model loaded successfully.")
+            except Exception as e:
+                print(f"Error loading model: {e}")
+        else:
+            print(f"Warning: Model file not found at {MODEL_PATH}. Prediction will fail.")
 
 # Login Decorator
 def login_required(f):
@@ -244,7 +251,6 @@ def predict():
         return jsonify(result)
 
 if __name__ == '__main__':
-    load_inference_model()
     # Hugging Face Spaces defaults to port 7860
     port = int(os.environ.get('PORT', 7860))
     app.run(debug=True, host='0.0.0.0', port=port)
@@ -0,0 +1,469 @@
+"""
+Hyperparameter Sweep Runner
+Runs k-fold (or holdout) trials of the MobileNetV2 classifier over a grid or a
+random sample of SEARCH_SPACE, in parallel worker processes, and writes a
+leaderboard with validation accuracy. None of the searched knobs changes the
+inference graph, so single-image latency is measured once for the served
+model and reported alongside the leaderboard.
+
+Frozen-backbone features are computed once per distinct frozen prefix and
+cached under CACHE_DIR, so trials that only differ in learning rate, batch
+size or dropout train the unfrozen top of the network on cached activations
+instead of re-running the whole backbone every epoch. Cached features are
+deterministic, so sweep trials do not use the random augmentation of train.py.
+
+Usage:
+    python sweep.py --mode grid --folds 3
+    python sweep.py --mode random --trials 8 --folds 1   # holdout
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from train import (BATCH_SIZE, EPOCHS, LEARNING_RATE, UNFREEZE_LAYERS,
+                   IMG_SIZE, NUM_CLASSES, TRAIN_DIR)
+
+CACHE_DIR = 'models/sweep_cache'
+LEADERBOARD_PATH = 'models/sweep_leaderboard.json'
+
+# unfreeze_layers must cut MobileNetV2 between residual blocks, since the
+# frozen prefix is cached as a single tensor; main() rejects other values
+# before any work starts and prints the allowed ones
+SEARCH_SPACE = {
+    'batch_size': [16, BATCH_SIZE],
+    'learning_rate': [LEARNING_RATE, 0.0003, 0.001],
+    'unfreeze_layers': [0, UNFREEZE_LAYERS, 60],
+    'dropout': [0.3, 0.4],
+}
+
+# Same extensions flow_from_directory accepts, so both see the same dataset
+IMAGE_EXTENSIONS = ('png', 'jpg', 'jpeg', 'bmp', 'ppm', 'tif', 'tiff')
+
+HOLDOUT_FRACTION = 0.15   # Same share as validation_split in train.py
+PRUNE_WARMUP_EPOCHS = 2   # Never prune before this many epochs
+PRUNE_MIN_TRIALS = 3      # Need this many reports at an epoch to compare against
+LATENCY_RUNS = 20
+
+
+def available_cores():
+    """Number of CPU cores this process is allowed to run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def list_images(data_dir=TRAIN_DIR):
+    """
+    Lists training images and their labels the way flow_from_directory does:
+    classes are indexed in sorted order, class folders are walked recursively
+    and files without an image extension (e.g. .DS_Store) are skipped.
+    """
+    classes = sorted(d for d in os.listdir(data_dir)
+                     if os.path.isdir(os.path.join(data_dir, d)))
+    paths, labels = [], []
+    for idx, name in enumerate(classes):
+        for root, _, files in sorted(os.walk(os.path.join(data_dir, name)), key=lambda w: w[0]):
+            for f in sorted(files):
+                if f.lower().endswith(tuple('.' + ext for ext in IMAGE_EXTENSIONS)):
+                    paths.append(os.path.join(root, f))
+                    labels.append(idx)
+    return paths, np.array(labels), classes
+
+
+def dataset_fingerprint(paths):
+    """Hash of file names, sizes and mtimes, used to invalidate the feature cache."""
+    h = hashlib.sha1()
+    for p in paths:
+        st = os.stat(p)
+        h.update(f"{p}|{st.st_size}|{int(st.st_mtime)}".encode())
+    return h.hexdigest()[:12]
+
+
+def make_configs(mode, n_trials, seed):
+    """Expands SEARCH_SPACE into a list of trial configs."""
+    keys = list(SEARCH_SPACE)
+    grid = [dict(zip(keys, values)) for values in itertools.product(*SEARCH_SPACE.values())]
+    if mode == 'random':
+        rng = random.Random(seed)
+        grid = rng.sample(grid, k=min(n_trials, len(grid)))
+    return grid
+
+
+def make_folds(labels, n_folds, seed):
+    """Stratified k-fold splits, or a single stratified holdout split when n_folds == 1."""
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+
+    indices = np.arange(len(labels))
+    if n_folds == 1:
+        train_idx, val_idx = train_test_split(
+            indices, test_size=HOLDOUT_FRACTION, stratify=labels, random_state=seed
+        )
+        return [(train_idx, val_idx)]
+    skf = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    return list(skf.split(indices, labels))
+
+
+def _init_worker(threads):
+    """Caps TensorFlow threads so parallel workers do not oversubscribe the cores."""
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _backbone(weights='imagenet'):
+    from tensorflow.keras.applications import MobileNetV2
+
+    return MobileNetV2(
+        weights=weights,
+        include_top=False,
+        input_shape=(IMG_SIZE[0], IMG_SIZE[1], 3)
+    )
+
+
+def _tail(base_model, unfreeze_layers):
+    """
+    Model from the cut point to the backbone output.
+    Raises ValueError if a residual connection bypasses the cut point.
+    """
+    from tensorflow.keras.models import Model
+
+    cut = base_model.layers[len(base_model.layers) - unfreeze_layers - 1].output
+    return Model(inputs=cut, outputs=base_model.output)
+
+
+def _split_backbone(unfreeze_layers):
+    """
+    Splits MobileNetV2 into a frozen prefix and a trainable tail.
+
+    Returns:
+        tuple: (frozen_model, tail_model). tail_model is None when the whole
+        backbone is frozen.
+    """
+    from tensorflow.keras.models import Model
+
+    base_model = _backbone()
+    if unfreeze_layers == 0:
+        return base_model, None
+    tail_model = _tail(base_model, unfreeze_layers)
+    cut = base_model.layers[len(base_model.layers) - unfreeze_layers - 1].output
+    frozen_model = Model(inputs=base_model.input, outputs=cut)
+    return frozen_model, tail_model
+
+
+def allowed_unfreeze_values(candidates=None):
+    """
+    Filters candidates (default: every possible layer count) down to the
+    unfreeze_layers values whose cut point falls between residual blocks.
+    """
+    base_model = _backbone(weights=None)
+    if candidates is None:
+        candidates = range(len(base_model.layers))
+    allowed = []
+    for n in candidates:
+        if not 0 <= n < len(base_model.layers):
+            continue
+        if n > 0:
+            try:
+                _tail(base_model, n)
+            except ValueError:
+                continue
+        allowed.append(n)
+    return allowed
+
+
+def extract_features(unfreeze_layers, paths, cache_path):
+    """Runs the frozen prefix over every image once and saves the activations."""
+    from utils import preprocess_image
+
+    if os.path.exists(cache_path):
+        return cache_path
+    frozen_model, _ = _split_backbone(unfreeze_layers)
+    tmp_path = cache_path + '.tmp.npy'
+    # Written batch by batch so the full feature array is never held in RAM
+    features = np.lib.format.open_memmap(
+        tmp_path, mode='w+', dtype=np.float32,
+        shape=(len(paths),) + tuple(frozen_model.output_shape[1:])
+    )
+    for start in range(0, len(paths), BATCH_SIZE):
+        imgs = []
+        for p in paths[start:start + BATCH_SIZE]:
+            img = preprocess_image(p, target_size=IMG_SIZE)
+            if img is None:
+                # Skipping would misalign features and labels
+                raise ValueError(f"Could not load {p}; remove it from {TRAIN_DIR}")
+            imgs.append(img)
+        batch = np.concatenate(imgs)
+        features[start:start + len(imgs)] = frozen_model.predict(batch, verbose=0)
+    features.flush()
+    del features
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def _build_trial_model(config, feature_shape):
+    """Builds the trainable part of the network on top of cached features."""
+    from tensorflow.keras.layers import Input
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.optimizers import Adam
+    from train import build_head
+
+    inputs = Input(shape=feature_shape)
+    x = inputs
+    if config['unfreeze_layers'] > 0:
+        # Fresh ImageNet weights for the tail on every fold
+        _, tail_model = _split_backbone(config['unfreeze_layers'])
+        x = tail_model(x)
+    outputs = build_head(x, dropout=config['dropout'])
+    model = Model(inputs=inputs, outputs=outputs)
+    model.compile(
+        optimizer=Adam(learning_rate=config['learning_rate']),
+        loss='categorical_crossentropy',
+        metrics=['accuracy']
+    )
+    return model
+
+
+def measure_latency(model, runs=LATENCY_RUNS):
+    """Median single-image predict() latency in milliseconds, as served by app.py."""
+    x = np.random.rand(1, IMG_SIZE[0], IMG_SIZE[1], 3).astype(np.float32)
+    model.predict(x, verbose=0)  # Warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        model.predict(x, verbose=0)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def report_val_accuracy(history, lock, trial_id, fold, epoch, acc):
+    """
+    Records a trial's val_accuracy for (fold, epoch) in the shared history and
+    returns True when the trial should be pruned: past the warm-up, with at
+    least PRUNE_MIN_TRIALS other trials to compare against, and below their
+    median. A trial's own reports are never part of the comparison.
+    """
+    key = (fold, epoch)
+    with lock:
+        reports = list(history.get(key, []))
+        history[key] = reports + [(trial_id, float(acc))]
+    others = [a for t, a in reports if t != trial_id]
+    return (epoch + 1 >= PRUNE_WARMUP_EPOCHS and len(others) >= PRUNE_MIN_TRIALS
+            and acc < np.median(others))
+
+
+def _feature_sequence(features, one_hot, indices, batch_size, sample_weights=None, shuffle=False):
+    """
+    Keras Sequence that slices the memory-mapped feature cache one batch at a
+    time, so a worker never copies a whole fold into RAM.
+    """
+    from tensorflow.keras.utils import Sequence
+
+    class FeatureSequence(Sequence):
+        def __init__(self):
+            super().__init__()
+            self.order = np.array(indices)
+            self.on_epoch_end()
+
+        def __len__(self):
+            return int(np.ceil(len(self.order) / batch_size))
+
+        def __getitem__(self, i):
+            # Sorted indices keep reads from the memmap sequential
+            idx = np.sort(self.order[i * batch_size:(i + 1) * batch_size])
+            batch = (features[idx], one_hot[idx])
+            if sample_weights is not None:
+                batch += (sample_weights[idx],)
+            return batch
+
+        def on_epoch_end(self):
+            if shuffle:
+                np.random.shuffle(self.order)
+
+    return FeatureSequence()
+
+
+def run_trial(trial_id, config, folds, cache_path, labels, history, lock):
+    """Trains one config on every fold; returns its leaderboard row."""
+    from sklearn.utils import class_weight
+    from tensorflow.keras.backend import clear_session
+    from tensorflow.keras.callbacks import Callback, EarlyStopping
+    from tensorflow.keras.utils import to_categorical
+
+    class MedianPruner(Callback):
+        """Stops the trial when report_val_accuracy() says so."""
+
+        def __init__(self, fold):
+            super().__init__()
+            self.fold = fold
+            self.pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            acc = (logs or {}).get('val_accuracy')
+            if acc is None:
+                return
+            if report_val_accuracy(history, lock, trial_id, self.fold, epoch, acc):
+                print(f"[Trial {trial_id}] Pruned at epoch {epoch + 1} (val_accuracy {acc:.4f})")
+                self.pruned = True
+                self.model.stop_training = True
+
+    features = np.load(cache_path, mmap_mode='r')
+    one_hot = to_categorical(labels, NUM_CLASSES)
+    fold_scores = []
+    status = 'complete'
+
+    for fold, (train_idx, val_idx) in enumerate(folds):
+        # Workers run many folds; drop the previous fold's graphs and models
+        clear_session()
+        weights = class_weight.compute_class_weight(
+            class_weight='balanced',
+            classes=np.unique(labels[train_idx]),
+            y=labels[train_idx]
+        )
+        # Per-sample form of class_weight, which Sequence inputs carry themselves
+        sample_weights = weights[labels].astype(np.float32)
+        pruner = MedianPruner(fold)
+        model = _build_trial_model(config, features.shape[1:])
+        fit = model.fit(
+            _feature_sequence(features, one_hot, train_idx, config['batch_size'],
+                              sample_weights=sample_weights, shuffle=True),
+            validation_data=_feature_sequence(features, one_hot, val_idx, config['batch_size']),
+            epochs=EPOCHS,
+            callbacks=[
+                EarlyStopping(monitor='val_accuracy', patience=7, mode='max',
+                              restore_best_weights=True),
+                pruner
+            ],
+            verbose=0
+        )
+        fold_scores.append(max(fit.history['val_accuracy']))
+        print(f"[Trial {trial_id}] Fold {fold + 1}/{len(folds)}: val_accuracy {fold_scores[-1]:.4f}")
+        if pruner.pruned:
+            status = 'pruned'
+            break
+
+    return {
+        'trial': trial_id,
+        'config': config,
+        'status': status,
+        'folds_run': len(fold_scores),
+        'mean_accuracy': float(np.mean(fold_scores)),
+        'std_accuracy': float(np.std(fold_scores))
+    }
+
+
+def print_leaderboard(rows, latency_ms):
+    print("\n===== SWEEP LEADERBOARD =====")
+    print(f"{'#':>3}  {'acc':>7}  {'±':>6}  {'status':<8}  config")
+    for rank, row in enumerate(rows, start=1):
+        print(f"{rank:>3}  {row['mean_accuracy']*100:6.2f}%  {row['std_accuracy']*100:5.2f}%  "
+              f"{row['status']:<8}  {row['config']}")
+    print(f"Inference latency (all configs, batch of 1): {latency_ms:.1f} ms")
+    print("=============================")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hyperparameter sweep over SEARCH_SPACE.')
+    parser.add_argument('--mode', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--trials', type=int, default=8, help='Number of configs in random mode')
+    parser.add_argument('--folds', type=int, default=3, help='k for k-fold; 1 runs a single holdout split')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel trials (default: available cores)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    for name in ('folds', 'trials', 'workers'):
+        value = getattr(args, name)
+        if value is not None and value < 1:
+            parser.error(f"--{name} must be at least 1, got {value}")
+
+    configs = make_configs(args.mode, args.trials, args.seed)
+    unfreeze_values = sorted({c['unfreeze_layers'] for c in configs})
+    invalid = sorted(set(unfreeze_values) - set(allowed_unfreeze_values(unfreeze_values)))
+    if invalid:
+        print(f"Error: unfreeze_layers {invalid} would cut MobileNetV2 inside a residual block.")
+        print(f"Allowed values: {allowed_unfreeze_values()}")
+        return
+
+    if not os.path.exists(TRAIN_DIR):
+        print(f"Error: Training directory not found at {TRAIN_DIR}")
+        print("Run 'python reorganize_dataset.py' first to create the 3-class dataset.")
+        return
+
+    paths, labels, classes = list_images()
+    print(f"Found {len(paths)} images in {len(classes)} classes: {classes}")
+
+    folds = make_folds(labels, args.folds, args.seed)
+    cores = available_cores()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fingerprint = dataset_fingerprint(paths)
+    cache_paths = {
+        n: os.path.join(CACHE_DIR, f"features_{fingerprint}_{IMG_SIZE[0]}_unfreeze{n}.npy")
+        for n in unfreeze_values
+    }
+
+    # Built before the pools so the ImageNet weights are downloaded once, not
+    # concurrently by every worker; timed after them so nothing competes for cores
+    from train import build_model
+    inference_model = build_model()
+
+    # TensorFlow is not fork-safe, so every child process is spawned
+    ctx = mp.get_context('spawn')
+
+    # Phase 1: one feature extraction per distinct frozen prefix, sharing all cores
+    extractors = min(len(cache_paths), cores)
+    print(f"Caching frozen-backbone features on {extractors} worker(s)...")
+    with ProcessPoolExecutor(
+            max_workers=extractors, mp_context=ctx,
+            initializer=_init_worker, initargs=(max(1, cores // extractors),)) as pool:
+        pending = {pool.submit(extract_features, n, paths, path): n for n, path in cache_paths.items()}
+        for future in as_completed(pending):
+            n = pending[future]
+            try:
+                print(f"  unfreeze_layers={n}: {future.result()}")
+            except Exception as e:
+                print(f"  unfreeze_layers={n}: feature extraction failed: {e}")
+                del cache_paths[n]
+
+    configs = [c for c in configs if c['unfreeze_layers'] in cache_paths]
+    if not configs:
+        print("Error: No features could be cached; nothing to run.")
+        return
+
+    # Phase 2: trials, sharing per-(fold, epoch) accuracies for median pruning
+    workers = max(1, min(args.workers or cores, cores, len(configs)))
+    threads = max(1, cores // workers)
+    print(f"Running {len(configs)} configs x {len(folds)} fold(s) on {workers} worker(s), {threads} thread(s) each")
+    with ctx.Manager() as manager, ProcessPoolExecutor(
+            max_workers=workers, mp_context=ctx,
+            initializer=_init_worker, initargs=(threads,)) as pool:
+        history, lock = manager.dict(), manager.Lock()
+        pending = [
+            pool.submit(run_trial, i, config, folds, cache_paths[config['unfreeze_layers']],
+                        labels, history, lock)
+            for i, config in enumerate(configs)
+        ]
+        rows = []
+        for future in as_completed(pending):
+            try:
+                rows.append(future.result())
+            except Exception as e:
+                print(f"Trial failed: {e}")
+
+    latency_ms = measure_latency(inference_model)
+    rows.sort(key=lambda r: (r['status'] != 'complete', -r['mean_accuracy'], -r['folds_run']))
+    print_leaderboard(rows, latency_ms)
+
+    with open(LEADERBOARD_PATH, 'w') as f:
+        json.dump({'latency_ms': latency_ms, 'trials': rows}, f, indent=2)
+    print(f"Leaderboard saved to {LEADERBOARD_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Import-time budget for the web app.
+
+Non-inference routes must not pay for TensorFlow, so importing app.py or
+utils.py may not pull it in. sweep.py keeps its helpers TensorFlow-free too,
+so they can be tested and reused without loading it. Each check runs in a fresh interpreter so that
+modules already imported by pytest do not hide a regression.
+"""
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous wall-clock ceiling; importing TensorFlow alone takes several seconds
+IMPORT_BUDGET_SECONDS = 3.0
+
+
+def _import_in_subprocess(module, cwd):
+    code = (
+        f"import sys, {module}; "
+        f"assert 'tensorflow' not in sys.modules, 'importing {module} pulled in TensorFlow'"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env,
+                          capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    assert proc.returncode == 0, proc.stderr
+    return elapsed
+
+
+@pytest.mark.parametrize('module, deps', [
+    ('utils', ['numpy']),
+    ('app', ['numpy', 'flask']),
+    ('sweep', ['numpy']),
+])
+def test_import_does_not_load_tensorflow(module, deps, tmp_path):
+    for dep in deps:
+        pytest.importorskip(dep)
+    # app.py creates data/ relative to the working directory; keep it out of the repo
+    elapsed = _import_in_subprocess(module, cwd=tmp_path)
+    assert elapsed < IMPORT_BUDGET_SECONDS, (
+        f"importing {module} took {elapsed:.2f}s (budget {IMPORT_BUDGET_SECONDS}s)"
+    )
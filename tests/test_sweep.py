@@ -0,0 +1,110 @@
+"""Tests for the TensorFlow-free parts of the hyperparameter sweep runner."""
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+sweep = pytest.importorskip('sweep')
+
+
+def _grid_size():
+    size = 1
+    for values in sweep.SEARCH_SPACE.values():
+        size *= len(values)
+    return size
+
+
+def test_grid_mode_returns_every_config():
+    configs = sweep.make_configs('grid', n_trials=1, seed=0)
+    assert len(configs) == _grid_size()
+
+
+def test_random_mode_samples_distinct_configs():
+    configs = sweep.make_configs('random', n_trials=5, seed=0)
+    assert len(configs) == 5
+    assert len({tuple(sorted(c.items())) for c in configs}) == 5
+
+
+def test_random_mode_is_capped_at_grid_size():
+    configs = sweep.make_configs('random', n_trials=10_000, seed=0)
+    assert len(configs) == _grid_size()
+
+
+def test_holdout_split_is_stratified():
+    pytest.importorskip('sklearn')
+    labels = np.array([0] * 80 + [1] * 20)
+    folds = sweep.make_folds(labels, n_folds=1, seed=0)
+    assert len(folds) == 1
+    train_idx, val_idx = folds[0]
+    assert len(val_idx) == 15
+    assert (labels[val_idx] == 1).sum() == 3
+    assert set(train_idx).isdisjoint(val_idx)
+
+
+def test_kfold_validation_sets_partition_the_data():
+    pytest.importorskip('sklearn')
+    labels = np.array([0] * 80 + [1] * 20)
+    folds = sweep.make_folds(labels, n_folds=4, seed=0)
+    assert len(folds) == 4
+    val_sets = [set(val_idx) for _, val_idx in folds]
+    assert set().union(*val_sets) == set(range(len(labels)))
+    assert sum(len(v) for v in val_sets) == len(labels)
+    for _, val_idx in folds:
+        assert (labels[val_idx] == 1).sum() == 5
+
+
+def test_list_images_skips_non_image_files(tmp_path):
+    files = {
+        'BACTERIA': ['a.jpeg', '.DS_Store'],
+        'NORMAL': ['b.PNG', 'notes.txt'],
+        'VIRUS': ['c.jpg', 'Thumbs.db'],
+    }
+    for class_name, names in files.items():
+        (tmp_path / class_name).mkdir()
+        for name in names:
+            (tmp_path / class_name / name).write_bytes(b'')
+
+    paths, labels, classes = sweep.list_images(str(tmp_path))
+
+    assert classes == ['BACTERIA', 'NORMAL', 'VIRUS']
+    assert [p.rsplit('/', 1)[-1] for p in paths] == ['a.jpeg', 'b.PNG', 'c.jpg']
+    assert labels.tolist() == [0, 1, 2]
+
+
+class TestPruningRule:
+    def setup_method(self):
+        self.history = {}
+        self.lock = threading.Lock()
+
+    def report(self, trial_id, acc, fold=0, epoch=sweep.PRUNE_WARMUP_EPOCHS - 1):
+        return sweep.report_val_accuracy(self.history, self.lock, trial_id, fold, epoch, acc)
+
+    def seed_other_trials(self, n, fold=0, epoch=sweep.PRUNE_WARMUP_EPOCHS - 1):
+        for trial_id in range(100, 100 + n):
+            assert not self.report(trial_id, 0.9, fold=fold, epoch=epoch)
+
+    def test_prunes_below_median_of_other_trials(self):
+        self.seed_other_trials(sweep.PRUNE_MIN_TRIALS)
+        assert self.report(1, 0.5)
+
+    def test_keeps_trial_at_or_above_median(self):
+        self.seed_other_trials(sweep.PRUNE_MIN_TRIALS)
+        assert not self.report(1, 0.9)
+
+    def test_never_prunes_during_warmup(self):
+        epoch = sweep.PRUNE_WARMUP_EPOCHS - 2
+        self.seed_other_trials(sweep.PRUNE_MIN_TRIALS, epoch=epoch)
+        assert not self.report(1, 0.1, epoch=epoch)
+
+    def test_needs_minimum_number_of_other_trials(self):
+        self.seed_other_trials(sweep.PRUNE_MIN_TRIALS - 1)
+        assert not self.report(1, 0.1)
+
+    def test_never_compares_trial_with_itself(self):
+        for _ in range(sweep.PRUNE_MIN_TRIALS):
+            assert not self.report(1, 0.9)
+        assert not self.report(1, 0.1)
+
+    def test_folds_are_compared_separately(self):
+        self.seed_other_trials(sweep.PRUNE_MIN_TRIALS, fold=0)
+        assert not self.report(1, 0.1, fold=1)
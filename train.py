@@ -1,19 +1,16 @@
-import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
-from tensorflow.keras.applications import MobileNetV2
-from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
-from tensorflow.keras.models import Model
-from tensorflow.keras.optimizers import Adam
-from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
 import os
 import json
 
+# TensorFlow is imported inside the functions that use it, so the
+# configuration below can be shared (e.g. by sweep.py) without loading it
+
 # Configuration
 BATCH_SIZE = 32
 IMG_SIZE = (224, 224)
 EPOCHS = 25
 LEARNING_RATE = 0.0001
 NUM_CLASSES = 3  # NORMAL, BACTERIA, VIRUS
+UNFREEZE_LAYERS = 30  # Top MobileNetV2 layers to fine-tune
 
 DATA_DIR = 'chest_xray_3class'
 TRAIN_DIR = os.path.join(DATA_DIR, 'train')
@@ -22,32 +19,41 @@ TEST_DIR = os.path.join(DATA_DIR, 'test')
 MODEL_SAVE_PATH = 'models/pneumonia_model.h5'
 CLASS_MAP_PATH = 'models/class_indices.json'
 
-def build_model():
+def build_head(x, dropout=0.4):
+    """Classification head shared by training and the sweep runner."""
+    from tensorflow.keras.layers import Dense, GlobalAveragePooling2D, Dropout
+
+    x = GlobalAveragePooling2D()(x)
+    x = Dense(256, activation='relu')(x)
+    x = Dropout(dropout)(x)
+    x = Dense(128, activation='relu')(x)
+    x = Dropout(0.3)(x)
+    return Dense(NUM_CLASSES, activation='softmax')(x)
+
+def build_model(learning_rate=LEARNING_RATE, unfreeze_layers=UNFREEZE_LAYERS, dropout=0.4):
     """Builds the MobileNetV2 based 3-class model with fine-tuning."""
+    from tensorflow.keras.applications import MobileNetV2
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.optimizers import Adam
+
     base_model = MobileNetV2(
         weights='imagenet',
         include_top=False,
         input_shape=(IMG_SIZE[0], IMG_SIZE[1], 3)
     )
     
-    # Fine-tune: Unfreeze the top 30 layers of MobileNetV2
+    # Fine-tune: Unfreeze the top layers of MobileNetV2
     # This allows the model to learn X-ray specific features
     base_model.trainable = True
-    for layer in base_model.layers[:-30]:
+    for layer in base_model.layers[:len(base_model.layers) - unfreeze_layers]:
         layer.trainable = False
     
-    x = base_model.output
-    x = GlobalAveragePooling2D()(x)
-    x = Dense(256, activation='relu')(x)
-    x = Dropout(0.4)(x)
-    x = Dense(128, activation='relu')(x)
-    x = Dropout(0.3)(x)
-    predictions = Dense(NUM_CLASSES, activation='softmax')(x)
+    predictions = build_head(base_model.output, dropout=dropout)
     
     model = Model(inputs=base_model.input, outputs=predictions)
     
     model.compile(
-        optimizer=Adam(learning_rate=LEARNING_RATE),
+        optimizer=Adam(learning_rate=learning_rate),
         loss='categorical_crossentropy',
         metrics=['accuracy']
     )
@@ -55,6 +61,9 @@ def build_model():
     return model
 
 def main():
+    from tensorflow.keras.preprocessing.image import ImageDataGenerator
+    from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
+
     # Verify directories exist
     if not os.path.exists(TRAIN_DIR):
         print(f"Error: Training directory not found at {TRAIN_DIR}")
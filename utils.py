@@ -1,5 +1,3 @@
-import tensorflow as tf
-from tensorflow.keras.preprocessing import image
 import numpy as np
 import os
 import json
@@ -19,6 +17,8 @@ def preprocess_image(image_path, target_size=(224, 224)):
         numpy.ndarray: Preprocessed image batch (1, 224, 224, 3).
     """
     try:
+        # Imported here so that importing utils does not pull in TensorFlow
+        from tensorflow.keras.preprocessing import image
         img = image.load_img(image_path, target_size=target_size)
         img_array = image.img_to_array(img)
         img_array = np.expand_dims(img_array, axis=0)